@@ -1,15 +1,74 @@
 # views.py
+import hashlib
+import heapq
+import json
+import math
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from django.http import JsonResponse
+from functools import lru_cache
+from operator import itemgetter
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_GET
 
 # External API (replace with actual API)
 ELECTRONICS_API = 'https://example.com/api/electronics'
 
+# Upstream feeds merged into the product list (fetched concurrently)
+PRODUCT_FEEDS = [ELECTRONICS_API]
+
+# Shared session so connections to the API are kept alive between requests
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+# How long fetched product data is reused before hitting the API again (seconds)
+PRODUCTS_CACHE_TTL = 300
+
+# How long a serialized response is reused for identical query parameters (seconds)
+RESPONSE_CACHE_TTL = 60
+
+# Responses with more products than this are streamed instead of cached
+STREAMING_THRESHOLD = 1000
+
 # Static conversion rate
 USD_TO_INR = 83.0
 
+# Upstream keys mapped to the field names returned by this endpoint
+SOURCE_FIELD_MAP = {
+    'id': 'product_id',
+    'name': 'product_name',
+    'brand': 'brand_name',
+    'category': 'category_name',
+    'description': 'description_text',
+    'price': 'price',
+    'currency': 'currency',
+    'processor': 'processor',
+    'memory': 'memory',
+    'release_date': 'release_date',
+    'average_rating': 'average_rating',
+    'rating_count': 'rating_count'
+}
+
+# Keys an upstream item must have to be kept
+REQUIRED_KEYS = frozenset(SOURCE_FIELD_MAP)
+
+# Month names for formatted release dates (same output as strftime('%B'))
+MONTH_NAMES = (
+    'January', 'February', 'March', 'April', 'May', 'June', 'July',
+    'August', 'September', 'October', 'November', 'December'
+)
+
+# Sort key per sort_by field, built once at import. Release dates sort on the
+# ordinal computed at ingestion (always an int); other fields treat None as 0.
+SORT_KEYS = {
+    'price': lambda p: p['price'] or 0,
+    'release_date': itemgetter('_release_ordinal'),
+    'rating_count': lambda p: p['rating_count'] or 0
+}
+
 # Field renaming map
 FIELD_RENAME_MAP = {
     'average_rating': 'avgRating',
@@ -20,6 +79,15 @@ FIELD_RENAME_MAP = {
     'product_id': 'productId'
 }
 
+# Upstream keys mapped to the renamed field names (rename_fields=true)
+RENAMED_FIELD_MAP = {
+    source_key: FIELD_RENAME_MAP.get(key, key) for source_key, key in SOURCE_FIELD_MAP.items()
+}
+
+# Every field a transformed product can have, in the order _transform adds them
+OUTPUT_FIELDS = [*SOURCE_FIELD_MAP.values(), 'price_in_inr']
+RENAMED_OUTPUT_FIELDS = [*RENAMED_FIELD_MAP.values(), 'priceInINR']
+
 # Custom order for renamed fields
 CUSTOM_FIELD_ORDER = [
     'avgRating', 'ratingCount', 'releaseDate', 'price', 'priceInINR',
@@ -27,146 +95,270 @@ CUSTOM_FIELD_ORDER = [
     'productName', 'productId'
 ]
 
+# Position of each custom-ordered field; other fields sort after these
+CUSTOM_FIELD_POSITION = {field: i for i, field in enumerate(CUSTOM_FIELD_ORDER)}
 
-@require_GET
-def products(request):
+
+def _parse_release_date(value):
+    # Dates are normally YYYY-MM-DD, so slice them directly and only fall back
+    # to strptime for anything else
+    if not isinstance(value, str):
+        return None
     try:
-        response = requests.get(ELECTRONICS_API)
-        response.raise_for_status()
-        raw_data = response.json()
-    except Exception:
-        return JsonResponse({'error': 'Failed to fetch product data'}, status=500)
+        if (len(value) == 10 and value[4] == value[7] == '-' and value.isascii()
+                and value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit()):
+            return datetime(int(value[:4]), int(value[5:7]), int(value[8:]))
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=512)
+def _format_release_date(value):
+    # Unparseable values are returned unchanged
+    date_obj = _parse_release_date(value)
+    if date_obj is None:
+        return value
+    return f'{MONTH_NAMES[date_obj.month - 1]} {date_obj.day:02d}, {date_obj.year}'
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
 
+
+def _casefold(value):
+    return value.casefold() if isinstance(value, str) else None
+
+
+# Raised by the pipeline steps; the view turns it into a JSON error response
+class _QueryError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _ingest(raw_data):
     # Step 1: Filter out malformed data
     products = []
     for item in raw_data:
-        try:
-            required_keys = [
-                'id', 'name', 'brand', 'category', 'description',
-                'price', 'currency', 'processor', 'memory',
-                'release_date', 'average_rating', 'rating_count'
-            ]
-            if not all(k in item for k in required_keys):
-                continue
-
-            product = {
-                'product_id': item['id'],
-                'product_name': item['name'],
-                'brand_name': item['brand'],
-                'category_name': item['category'],
-                'description_text': item['description'],
-                'price': item['price'],
-                'currency': item['currency'],
-                'processor': item['processor'],
-                'memory': item['memory'],
-                'release_date': item['release_date'],
-                'average_rating': item['average_rating'],
-                'rating_count': item['rating_count']
-            }
-
-            products.append(product)
-        except Exception:
+        if not isinstance(item, dict) or not REQUIRED_KEYS <= item.keys():
             continue
 
+        # Precompute filter values once (underscore keys are not part of the response)
+        item['_rating'] = _to_float(item['average_rating'])
+        item['_brand'] = _casefold(item['brand'])
+        item['_category'] = _casefold(item['category'])
+
+        # Release date as a day number so sorting compares ints, not strings
+        release_date = _parse_release_date(item['release_date'])
+        item['_release_ordinal'] = release_date.toordinal() if release_date else 0
+
+        # Computed INR price, also done once here rather than per request
+        price = _to_float(item['price']) if item['currency'] == 'USD' else None
+        item['_price_in_inr'] = round(price * USD_TO_INR, 2) if price is not None else None
+
+        products.append(item)
+
+    return products
+
+
+def _fetch_feed(url):
+    response = _session.get(url, timeout=(3, 10))
+    response.raise_for_status()
+    return response.json()
+
+
+def _fetch_products():
+    # Total latency is the slowest feed rather than the sum of all of them
+    with ThreadPoolExecutor(max_workers=len(PRODUCT_FEEDS)) as executor:
+        feeds = list(executor.map(_fetch_feed, PRODUCT_FEEDS))
+    return _ingest(item for feed in feeds for item in feed)
+
+
+def _filter(products, params):
     # Step 2: Filtering
-    min_rating = request.GET.get('min_rating')
-    brand = request.GET.get('brand')
-    category = request.GET.get('category')
+    min_rating = params.get('min_rating')
+    brand = params.get('brand')
+    category = params.get('category')
 
     if min_rating:
         try:
             min_rating = float(min_rating)
-            products = [p for p in products if p['average_rating'] is not None and float(p['average_rating']) >= min_rating]
         except ValueError:
-            return JsonResponse({'error': 'Invalid min_rating value'}, status=400)
+            raise _QueryError('Invalid min_rating value')
+    else:
+        min_rating = None
+
+    # Case-fold the query values once rather than per product
+    brand = brand.casefold() if brand else None
+    category = category.casefold() if category else None
+
+    if min_rating is None and brand is None and category is None:
+        return products
 
-    if brand:
-        products = [p for p in products if p['brand_name'].lower() == brand.lower()]
+    # Apply all filters in a single pass over the products
+    return [
+        p for p in products
+        if (min_rating is None or (p['_rating'] is not None and p['_rating'] >= min_rating))
+        and (brand is None or p['_brand'] == brand)
+        and (category is None or p['_category'] == category)
+    ]
 
-    if category:
-        products = [p for p in products if p['category_name'].lower() == category.lower()]
 
+def _sort(products, params):
     # Step 3: Sorting
-    sort_by = request.GET.get('sort_by')
-    sort_order = request.GET.get('sort_order', 'asc')
+    sort_by = params.get('sort_by')
+    sort_order = params.get('sort_order', 'asc')
 
     valid_sort_fields = ['price', 'release_date', 'rating_count']
     if sort_by and sort_by in valid_sort_fields:
         reverse = (sort_order == 'desc')
         try:
-            products.sort(key=lambda x: x.get(sort_by) or 0, reverse=reverse)
+            products.sort(key=SORT_KEYS[sort_by], reverse=reverse)
         except Exception:
-            return JsonResponse({'error': 'Sorting error occurred'}, status=500)
+            raise _QueryError('Sorting error occurred', status=500)
     elif sort_by:
-        return JsonResponse({'error': f'Invalid sort_by field. Allowed: {valid_sort_fields}'}, status=400)
+        raise _QueryError(f'Invalid sort_by field. Allowed: {valid_sort_fields}')
 
-    # Step 4: Transformations
-    rename_fields = request.GET.get('rename_fields') == 'true'
-    format_date = request.GET.get('format_date') == 'true'
-    field_order = request.GET.get('field_order', '')  # alpha, reverse, custom
+    return products
 
-    transformed_products = []
 
-    for p in products:
-        transformed = {}
+def _top_n(products, params):
+    # Step 4: Top N (before transforming, so only the kept products are transformed)
+    top_n = params.get('top_n')
+    top_by = params.get('top_by')
 
-        for key, value in p.items():
-            final_key = FIELD_RENAME_MAP.get(key, key) if rename_fields else key
+    if not (top_n and top_by):
+        return products
 
-            # Format date
-            if format_date and key == 'release_date' and value:
-                try:
-                    date_obj = datetime.strptime(value, '%Y-%m-%d')
-                    value = date_obj.strftime('%B %d, %Y')
-                except ValueError:
-                    pass
+    try:
+        top_n = int(top_n)
+    except ValueError:
+        raise _QueryError('Invalid top_n value. Must be an integer.')
 
-            transformed[final_key] = value
+    if top_n < 0:
+        raise _QueryError('Invalid top_n value. Must not be negative.')
 
-        # Add computed field
-        if p['currency'] == 'USD' and p['price'] is not None:
-            price_in_inr = round(float(p['price']) * USD_TO_INR, 2)
-            transformed['priceInINR' if rename_fields else 'price_in_inr'] = price_in_inr
+    valid_top_fields = ['price', 'average_rating', 'rating_count']
+    if top_by not in valid_top_fields:
+        raise _QueryError(f'Invalid top_by field. Choose from {valid_top_fields}')
 
-        transformed_products.append(transformed)
+    return heapq.nlargest(top_n, products, key=lambda x: x.get(top_by) or 0)
 
-    # Step 5: Top N
-    top_n = request.GET.get('top_n')
-    top_by = request.GET.get('top_by')
 
-    if top_n and top_by:
-        try:
-            top_n = int(top_n)
-            valid_top_fields = ['price', 'average_rating', 'rating_count']
-            top_field_key = FIELD_RENAME_MAP.get(top_by, top_by) if rename_fields else top_by
+def _transform(products, params):
+    # Step 5: Transformations
+    rename_fields = params.get('rename_fields') == 'true'
+    format_date = params.get('format_date') == 'true'
 
-            if top_by not in valid_top_fields:
-                return JsonResponse({'error': f'Invalid top_by field. Choose from {valid_top_fields}'}, status=400)
+    field_map = RENAMED_FIELD_MAP if rename_fields else SOURCE_FIELD_MAP
+    date_key = field_map['release_date']
+    price_in_inr_key = 'priceInINR' if rename_fields else 'price_in_inr'
 
-            transformed_products.sort(key=lambda x: x.get(top_field_key) or 0, reverse=True)
-            transformed_products = transformed_products[:top_n]
+    transformed_products = []
 
-        except ValueError:
-            return JsonResponse({'error': 'Invalid top_n value. Must be an integer.'}, status=400)
+    for p in products:
+        transformed = {key: p[source_key] for source_key, key in field_map.items()}
+
+        # Format date
+        if format_date and isinstance(p['release_date'], str):
+            transformed[date_key] = _format_release_date(p['release_date'])
 
+        # Add computed field
+        if p['_price_in_inr'] is not None:
+            transformed[price_in_inr_key] = p['_price_in_inr']
+
+        transformed_products.append(transformed)
+
+    return transformed_products
+
+
+def _order(transformed_products, params):
     # Step 6: Field ordering
-    if field_order == 'alpha':
-        for i, p in enumerate(transformed_products):
-            transformed_products[i] = dict(sorted(p.items(), key=lambda x: x[0]))
+    rename_fields = params.get('rename_fields') == 'true'
+    field_order = params.get('field_order', '')  # alpha, reverse, custom
 
-    elif field_order == 'reverse':
-        for i, p in enumerate(transformed_products):
-            transformed_products[i] = dict(sorted(p.items(), key=lambda x: x[0], reverse=True))
+    fields = RENAMED_OUTPUT_FIELDS if rename_fields else OUTPUT_FIELDS
 
+    # Work out the field order once, then build every product in that order
+    if field_order == 'alpha':
+        ordered_fields = sorted(fields)
+    elif field_order == 'reverse':
+        ordered_fields = sorted(fields, reverse=True)
     elif field_order == 'custom' and rename_fields:
-        for i, p in enumerate(transformed_products):
-            ordered = {}
-            for field in CUSTOM_FIELD_ORDER:
-                if field in p:
-                    ordered[field] = p[field]
-            for k in p:
-                if k not in ordered:
-                    ordered[k] = p[k]
-            transformed_products[i] = ordered
-
-    return JsonResponse(transformed_products, safe=False)
+        # sorted() is stable, so fields outside CUSTOM_FIELD_ORDER keep their relative order
+        ordered_fields = sorted(fields, key=lambda f: CUSTOM_FIELD_POSITION.get(f, len(CUSTOM_FIELD_ORDER)))
+    else:
+        return transformed_products
+
+    return [{f: p[f] for f in ordered_fields if f in p} for p in transformed_products]
+
+
+def _pipeline(products, params):
+    products = _filter(products, params)
+    products = _sort(products, params)
+    products = _top_n(products, params)
+    return _order(_transform(products, params), params)
+
+
+def _finite(value):
+    # Non-finite floats become None, matching how orjson writes them (null)
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _finite(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_finite(v) for v in value]
+    return value
+
+
+def _dumps(value):
+    # orjson rejects integers beyond 64 bits; the stdlib encoder handles them.
+    # Both paths write NaN/Infinity as null so the output does not depend on
+    # which encoder ran.
+    try:
+        return orjson.dumps(value)
+    except orjson.JSONEncodeError:
+        return json.dumps(_finite(value), allow_nan=False, separators=(',', ':')).encode()
+
+
+def _stream_json_array(items):
+    # Encode one product at a time so the whole body is never held in memory
+    yield b'['
+    for i, item in enumerate(items):
+        yield (b',' if i else b'') + _dumps(item)
+    yield b']'
+
+
+def _response_cache_key(request):
+    params = repr(sorted(request.GET.lists()))
+    digest = hashlib.sha1(f'{request.path}?{params}'.encode()).hexdigest()
+    return f'products:{digest}'
+
+
+@require_GET
+def products(request):
+    cache_key = _response_cache_key(request)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return HttpResponse(cached, content_type='application/json')
+
+    try:
+        products = cache.get_or_set('electronics:normalized', _fetch_products, PRODUCTS_CACHE_TTL)
+    except Exception:
+        return JsonResponse({'error': 'Failed to fetch product data'}, status=500)
+
+    try:
+        transformed_products = _pipeline(products, request.GET)
+    except _QueryError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+
+    if len(transformed_products) > STREAMING_THRESHOLD:
+        return StreamingHttpResponse(_stream_json_array(transformed_products), content_type='application/json')
+
+    body = _dumps(transformed_products)
+    cache.set(cache_key, body, RESPONSE_CACHE_TTL)
+    return HttpResponse(body, content_type='application/json')